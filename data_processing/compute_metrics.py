@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Compute railway track length per area and per capita.
+
+Both metrics share the same inputs, so the population/area table and the
+track file are each parsed once and both output CSVs are written from the
+same pass. `compute_track_per_area.py` and `compute_track_per_capita.py`
+are thin wrappers around `main()`.
+
+Usage:
+  python3 compute_metrics.py            # writes both outputs
+  python3 compute_metrics.py area
+  python3 compute_metrics.py capita
+"""
+import argparse
+import csv
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+import pandas as pd
+import pycountry
+
+ROOT = Path(__file__).resolve().parent.parent
+TRACK_FILE = ROOT / 'data_processing' / 'track_length.csv'
+POP_FILE = ROOT / 'data_processing' / 'World Population by country 2024.csv'
+AREA_OUT_FILE = ROOT / 'inputs' / 'track_length_per_area_iso3.csv'
+CAPITA_OUT_FILE = ROOT / 'inputs' / 'track_length_per_capita_iso3.csv'
+SCALE = 1000  # multiply km-per-person by this factor
+
+# metric -> (denominator column, output file, multiplier)
+METRICS = {
+    # value = km of track / km^2 country area
+    'area': ('area', AREA_OUT_FILE, 1),
+    # value = km of track per person * SCALE
+    'capita': ('population', CAPITA_OUT_FILE, SCALE),
+}
+
+# small manual alias mappings for names that differ between files
+ALIAS = {
+    'congo': 'republic of the congo',
+    'dr congo': 'dr congo',
+    'ivory coast': 'ivory coast',
+    'south korea': 'south korea',
+    'north korea': 'north korea',
+    'united states': 'united states',
+}
+
+# Patterns are compiled once at import; they run for every CSV row.
+_QUOTE_RE = re.compile(r"[\'\"\,\.]")
+_NONALNUM_RE = re.compile(r"[^a-z0-9 ]+")
+_WS_RE = re.compile(r"\s+")
+_AREA_RE = re.compile(r'^([0-9]*\.?[0-9]+)\s*([kKmM]?)$')
+_AREA_JUNK_RE = re.compile('[\u202f\u2009,<]')
+_AREA_SUFFIX = {'K': 1_000, 'M': 1_000_000}
+_NUM_ONLY_RE = re.compile(r'[^0-9.]')
+_DIGITS_ONLY_RE = re.compile(r'[^0-9]')
+
+NUM2ALPHA3 = {c.numeric: c.alpha_3 for c in pycountry.countries}
+
+
+@lru_cache(maxsize=None)
+def numeric_to_alpha3(numeric_code: str) -> str:
+    """Convert numeric ISO code (e.g. '380' or '084') to alpha_3 (e.g. 'ITA')."""
+    if not numeric_code:
+        return ''
+    # the track file almost always holds clean codes; skip the regex for those
+    if numeric_code.isdigit() and len(numeric_code) <= 3:
+        code = numeric_code
+    else:
+        code = _DIGITS_ONLY_RE.sub('', numeric_code)
+    return NUM2ALPHA3.get(code.zfill(3), '')
+
+
+def norm_names(names):
+    """Normalize a Series of country names (lower-case, punctuation dropped)."""
+    names = names.str.strip().str.lower().str.replace(_QUOTE_RE, '', regex=True)
+    names = names.str.replace(_NONALNUM_RE, ' ', regex=True)
+    return names.str.replace(_WS_RE, ' ', regex=True).str.strip()
+
+
+def parse_areas(raw):
+    """Parse a Series of area strings like '3M', '364.5K', '9.4M' or '< 1' to km^2.
+
+    Values that can't be parsed become NaN.
+    """
+    # drop thin spaces, thousands separators and '<' ('< 1' -> 1)
+    s = raw.str.strip().str.replace(_AREA_JUNK_RE, '', regex=True).str.strip()
+    ext = s.str.extract(_AREA_RE)
+    mult = ext[1].str.upper().map(_AREA_SUFFIX).fillna(1.0)
+    # fallback: strip non-digits
+    fallback = pd.to_numeric(s.str.replace(_NUM_ONLY_RE, '', regex=True), errors='coerce')
+    return (pd.to_numeric(ext[0], errors='coerce') * mult).where(ext[0].notna(), fallback)
+
+
+def build_token_index(keys):
+    """Map every word of the normalized names to the keys that contain it."""
+    index = {}
+    for k in keys:
+        for t in k.split():
+            index.setdefault(t, []).append(k)
+    return {t: tuple(ks) for t, ks in index.items()}
+
+
+def load_population_and_area(path):
+    """Read the population CSV once.
+
+    Returns `{'population': (values, token_index), 'area': (values, token_index)}`.
+    `values` is a Series indexed by normalized country name holding only the
+    rows where that column parsed (later rows win for duplicate names), and
+    `token_index` is the word index over those names used by `resolve_name`.
+    """
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    country_col = 'Country' if 'Country' in df.columns else 'country'
+    pop_col = 'Population 2024' if 'Population 2024' in df.columns else 'Population'
+    area_col = 'Area (km2)' if 'Area (km2)' in df.columns else 'Area'
+    df = df[df[country_col] != '']
+    names = norm_names(df[country_col])
+    columns = {
+        # remove commas and non-digits
+        'population': pd.to_numeric(df[pop_col].str.replace(_DIGITS_ONLY_RE, '', regex=True),
+                                    errors='coerce'),
+        'area': parse_areas(df[area_col]),
+    }
+    lookups = {}
+    for column, values in columns.items():
+        # a name whose value doesn't parse is unknown for this metric, so it
+        # can still be matched through the alias/word fallback
+        values = values.set_axis(names).dropna()
+        values = values[~values.index.duplicated(keep='last')]
+        lookups[column] = (values, build_token_index(values.index))
+    return lookups
+
+
+def read_tracks(path):
+    """Read the headerless `country, iso_numeric, track_km` file into a DataFrame."""
+    # csv.reader rather than pd.read_csv: pandas can't tell a missing third
+    # field (row skipped) from an empty one (track counted as 0)
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = [r[:3] for r in csv.reader(f) if len(r) >= 3]
+    df = pd.DataFrame(rows, columns=['country', 'iso', 'track'], dtype=str)
+    for col in df.columns:
+        df[col] = df[col].str.strip()
+    # empty or unparseable track values count as 0 km
+    df['track'] = pd.to_numeric(df['track'].str.replace(_NUM_ONLY_RE, '', regex=True),
+                                errors='coerce').fillna(0.0)
+    return df
+
+
+def resolve_name(name, keys, alias, token_index):
+    """Find the key for a name missing from `keys` via `alias`, then by shared words."""
+    if name in alias and alias[name] in keys:
+        return alias[name]
+    # fuzzy match: only keys sharing a word with the country are candidates
+    candidates = dict.fromkeys(k for t in name.split() for k in token_index.get(t, ()))
+    for k in candidates:
+        if name in k or k in name:
+            return k
+    return None
+
+
+def write_rows(path, rows):
+    """Write a country/country_ISO/value DataFrame to `path`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # CRLF matches the csv.writer output the committed inputs were made with
+    rows.to_csv(path, index=False, float_format='%.12f', lineterminator='\r\n')
+
+
+def main(metric=None):
+    """Write the output CSV for `metric` ('area' or 'capita'), or both if None."""
+    metrics = list(METRICS) if metric is None else [metric]
+
+    lookups = load_population_and_area(POP_FILE)
+
+    tracks = read_tracks(TRACK_FILE)
+    keys = norm_names(tracks['country'])
+
+    iso3 = tracks['iso'].map(numeric_to_alpha3)
+    iso3 = iso3.where(iso3 != '', tracks['iso'])
+
+    for name in metrics:
+        column, out_file, scale = METRICS[name]
+        values, token_index = lookups[column]
+        resolved = keys.copy()
+        missing = ~keys.isin(values.index)
+        resolved[missing] = keys[missing].map(
+            lambda k: resolve_name(k, values.index, ALIAS, token_index))
+        denom = values.reindex(resolved.to_numpy()).set_axis(tracks.index)
+        skipped = denom.isna() | (denom == 0)
+        value = (tracks['track'][~skipped] / denom[~skipped]) * scale
+        write_rows(out_file, pd.DataFrame({
+            'country': tracks['country'][~skipped],
+            'country_ISO': iso3[~skipped],
+            'value': value,
+        }))
+
+        unmatched = tracks.loc[skipped, 'country'].tolist()
+        if unmatched:
+            print(f'Warning: unmatched countries for {out_file.name} (skipped):', file=sys.stderr)
+            for u in unmatched:
+                print('-', u, file=sys.stderr)
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Compute track length per area / per capita')
+    p.add_argument('metric', nargs='?', choices=list(METRICS), help='Only compute this metric')
+    main(p.parse_args().metric)
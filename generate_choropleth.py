@@ -11,7 +11,9 @@ merges with the built-in Natural Earth world dataset from `geopandas`.
 import argparse
 import os
 import sys
+import tempfile
 
+import numpy as np
 import pandas as pd
 import geopandas as gpd
 import matplotlib.pyplot as plt
@@ -38,6 +40,11 @@ except Exception:
 # overlaid centered on every generated PNG. Set to None to disable.
 DEFAULT_WATERMARK = os.path.join(os.path.dirname(__file__), 'assets', 'watermark.png')
 
+# Local cache of the normalized Natural Earth countries (Feather, via pyarrow
+# from requirements.txt). Delete the file to force a reload from the
+# shapefile. Set to None to disable.
+NE_CACHE = os.path.join(os.path.dirname(__file__), '.cache', 'ne_110m.feather')
+
 # == Configuration (tweak these at the top of the file) ==
 # Colormap for static matplotlib plot (common matplotlib colormap name)
 DEFAULT_COLORMAP = LinearSegmentedColormap.from_list("custom_red_blue", ["#03a9fc", "purple", "red", "yellow", "green", "blue"])
@@ -54,8 +61,23 @@ DEFAULT_FIGSIZE = (14, 8)
 DEFAULT_MISSING_COLOR = 'lightgrey'
 # Output DPI for saved PNGs
 DEFAULT_DPI = 150
+# Tolerance (degrees) for topology-preserving simplification of the country
+# outlines; fewer vertices to draw and embed in HTML. 0 keeps full detail.
+DEFAULT_SIMPLIFY_TOLERANCE = 0.05
 # =====================================================
 
+# ISO alpha-2 -> alpha-3, used to accept two-letter codes in ISO columns.
+ALPHA2_TO_ALPHA3 = {c.alpha_2: c.alpha_3 for c in pycountry.countries} if pycountry is not None else {}
+
+# Lower-cased country names (short, common and official) -> ISO alpha-3,
+# built once so name columns can be mapped without per-row pycountry lookups.
+NAME2ISO = {}
+if pycountry is not None:
+    for _c in pycountry.countries:
+        for _n in (_c.name, getattr(_c, 'common_name', ''), getattr(_c, 'official_name', '')):
+            if _n:
+                NAME2ISO.setdefault(_n.strip().lower(), _c.alpha_3)
+
 
 def map_name_to_iso3(name):
     if not isinstance(name, str):
@@ -72,6 +94,17 @@ def map_name_to_iso3(name):
         return None
 
 
+def names_to_iso3(names):
+    """Vectorized `map_name_to_iso3`; only unknown names hit pycountry.lookup."""
+    s = names.astype(str).str.strip()
+    is_code = s.str.len().eq(3) & s.str.isalpha()
+    iso = s.str.lower().map(NAME2ISO).mask(is_code, s.str.upper())
+    missing = iso.isna()
+    if missing.any():
+        iso[missing] = s[missing].map(map_name_to_iso3)
+    return iso
+
+
 def auto_detect_columns(df):
     # common names
     country_candidates = [c for c in df.columns if c.lower() in ("country", "country_name", "name", "nation")]
@@ -88,23 +121,37 @@ def auto_detect_columns(df):
             iso_candidates[0] if iso_candidates else None)
 
 
-def _clean_iso_code(code):
-    if not isinstance(code, str):
-        return None
-    s = code.strip()
-    if len(s) == 3 and s.isalpha():
-        return s.upper()
-    if len(s) == 2 and pycountry is not None:
-        try:
-            c = pycountry.countries.get(alpha_2=s.upper())
-            return c.alpha_3
-        except Exception:
-            return None
-    return None
+def _clean_iso_codes(codes):
+    """Vectorized ISO cleanup: alpha-3 kept (upper-cased), alpha-2 converted, rest NaN."""
+    s = codes.astype(str).str.strip().str.upper()
+    is3 = s.str.len().eq(3) & s.str.isalpha()
+    return s.where(is3, s.map(ALPHA2_TO_ALPHA3))
+
+
+def _read_csv(csv_path, usecols=None):
+    # Arrow-backed parsing is faster and keeps string columns out of Python
+    # objects. pyarrow is in requirements.txt; the default engine remains the
+    # fallback for older environments (no pyarrow, pandas < 2) and for files
+    # the pyarrow parser rejects (e.g. short rows, which the C engine pads
+    # with NaN).
+    try:
+        return pd.read_csv(csv_path, usecols=usecols, engine='pyarrow', dtype_backend='pyarrow')
+    except (ImportError, TypeError, pd.errors.ParserError):
+        return pd.read_csv(csv_path, usecols=usecols)
 
 
 def load_and_prepare(csv_path, country_col, value_col, iso_col=None):
-    df = pd.read_csv(csv_path)
+    # Only narrow the read when the ISO column is named explicitly; otherwise
+    # auto-detection needs every column to find an ISO column to prefer.
+    usecols = None
+    if value_col and iso_col:
+        usecols = [c for c in (country_col, value_col, iso_col) if c]
+    try:
+        df = _read_csv(csv_path, usecols)
+    except (ValueError, KeyError):
+        # a requested column doesn't exist; load everything so the checks
+        # below can fall back or report the available columns
+        df = _read_csv(csv_path)
     if country_col is None or value_col is None or iso_col is None:
         detected_country, detected_value, detected_iso = auto_detect_columns(df)
         country_col = country_col or detected_country
@@ -119,7 +166,7 @@ def load_and_prepare(csv_path, country_col, value_col, iso_col=None):
     # If an ISO column is provided/detected, prefer it (faster, more reliable)
     if iso_col is not None and iso_col in df.columns:
         df[iso_col] = df[iso_col].astype(str)
-        df['iso_a3'] = df[iso_col].map(_clean_iso_code)
+        df['iso_a3'] = _clean_iso_codes(df[iso_col])
         missing_iso = df['iso_a3'].isna().sum()
         if missing_iso:
             print(f"Warning: {missing_iso} rows in '{iso_col}' couldn't be interpreted as ISO3. They will be skipped.")
@@ -129,13 +176,15 @@ def load_and_prepare(csv_path, country_col, value_col, iso_col=None):
             print("Available columns:", list(df.columns))
             sys.exit(1)
         df[country_col] = df[country_col].astype(str)
-        df['iso_a3'] = df[country_col].map(map_name_to_iso3)
+        df['iso_a3'] = names_to_iso3(df[country_col])
         missing_iso = df['iso_a3'].isna().sum()
         if missing_iso:
             print(f"Warning: {missing_iso} rows couldn't be mapped to ISO3 codes. They will be skipped.")
 
     df = df.dropna(subset=['iso_a3'])
     df[value_col] = pd.to_numeric(df[value_col], errors='coerce')
+    # plotting/folium expect NumPy floats with NaN, not Arrow-backed nulls
+    df[value_col] = df[value_col].to_numpy(dtype=float, na_value=np.nan)
     return df[['iso_a3', value_col]]
 
 
@@ -151,13 +200,17 @@ def generate_static_map(merged_gdf, value_col, out_png,
     # Axes for the map: [left, bottom, width, height] in figure coordinates.
     map_ax = fig.add_axes([0.0, 0.06, 1.0, 0.94])
 
-    # Determine vmin/vmax from merged data (ignore NaNs)
+    # Determine vmin/vmax from merged data (ignore NaNs) in a single pass
+    vmin = None
+    vmax = None
     try:
-        vmin = merged_gdf[value_col].min()
-        vmax = merged_gdf[value_col].max()
+        vals = merged_gdf[value_col].to_numpy(dtype=float)
+        mask = ~np.isnan(vals)
+        if mask.any():
+            vmin = vals[mask].min()
+            vmax = vals[mask].max()
     except Exception:
-        vmin = None
-        vmax = None
+        pass
 
     plot_kwargs = dict(column=value_col, cmap=colormap, linewidth=0.2, ax=map_ax,
                        edgecolor='0.6', legend=False,
@@ -165,6 +218,9 @@ def generate_static_map(merged_gdf, value_col, out_png,
     if vmin is not None and vmax is not None:
         plot_kwargs.update(dict(vmin=vmin, vmax=vmax))
 
+    # The first collection added by plot() holds the colored countries (missing
+    # ones are drawn after it); the colorbar reuses its cmap/norm.
+    n_collections = len(map_ax.collections)
     merged_gdf.plot(**plot_kwargs)
     map_ax.set_axis_off()
 
@@ -174,11 +230,8 @@ def generate_static_map(merged_gdf, value_col, out_png,
         map_ax.set_title(title, fontdict={'fontsize': 16}, pad=6)
 
     # Add a narrow horizontal colorbar overlaid inside the map axes (lower-center)
-    if vmin is not None and vmax is not None:
-        cmap_obj = plt.cm.get_cmap(colormap)
-        norm = plt.Normalize(vmin=vmin, vmax=vmax)
-        sm = plt.cm.ScalarMappable(cmap=cmap_obj, norm=norm)
-        sm._A = []  # required for matplotlib < 3.5 compatibility
+    if vmin is not None and vmax is not None and len(map_ax.collections) > n_collections:
+        mesh = map_ax.collections[n_collections]
 
         # Create an inset axes inside the main map axes. width/height can be
         # specified as percent strings to keep it responsive to figure size.
@@ -191,30 +244,18 @@ def generate_static_map(merged_gdf, value_col, out_png,
             cax = fig.add_axes([0.37, 0.04, 0.26, 0.03])
 
         # Make the colorbar semi-transparent so underlying map features remain visible
-        cbar = fig.colorbar(sm, cax=cax, orientation='horizontal')
+        cbar = fig.colorbar(mesh, cax=cax, orientation='horizontal')
         cbar.ax.patch.set_alpha(0.7)
 
-    # Ensure the figure renderer is initialized (required when using inset_axes)
-    try:
-        fig.canvas.draw()
-    except Exception:
-        pass
-
-    # Save with minimal padding to maximize map area. Avoid `bbox_inches='tight'`
-    # because inset_axes can cause issues with tight bbox calculations on
-    # some backends; using `bbox_inches=None` and `pad_inches=0` produces a
-    # full-figure image with minimal margins.
-    fig.savefig(out_png, dpi=dpi, bbox_inches=None, pad_inches=0)
-    print(f"Saved static map to {out_png}")
-
-    # If a watermark image exists, try to overlay it centered on the PNG.
+    # If a watermark image exists, draw it centered on top of the figure so the
+    # PNG only has to be encoded once.
     try:
         wm_path = DEFAULT_WATERMARK
         if wm_path and os.path.exists(wm_path) and PIL_AVAILABLE:
             try:
-                bg = Image.open(out_png).convert('RGBA')
                 wm = Image.open(wm_path).convert('RGBA')
-                bw, bh = bg.size
+                # size of the saved image in pixels
+                bw, bh = int(round(figsize[0] * dpi)), int(round(figsize[1] * dpi))
                 ww, wh = wm.size
                 # scale watermark if it's wider than 30% of background width
                 max_w = int(bw * 0.30)
@@ -225,10 +266,10 @@ def generate_static_map(merged_gdf, value_col, out_png,
                     wm = wm.resize((new_w, new_h), resample=Image.LANCZOS)
                     ww, wh = wm.size
 
-                # position centered
-                pos = ((bw - ww) // 2, (bh - wh) // 2)
-                bg.paste(wm, pos, wm)
-                bg.save(out_png)
+                # position centered; figimage offsets are measured from the bottom-left
+                xo = (bw - ww) // 2
+                yo = bh - (bh - wh) // 2 - wh
+                fig.figimage(np.asarray(wm), xo=xo, yo=yo, origin='upper', zorder=10)
                 print(f"Applied watermark from {wm_path} to {out_png}")
             except Exception as e:
                 print(f"Warning: failed to apply watermark: {e}")
@@ -237,15 +278,34 @@ def generate_static_map(merged_gdf, value_col, out_png,
     except Exception:
         pass
 
+    # Ensure the figure renderer is initialized (required when using inset_axes)
+    try:
+        fig.canvas.draw()
+    except Exception:
+        pass
+
+    # Save with minimal padding to maximize map area. Avoid `bbox_inches='tight'`
+    # because inset_axes can cause issues with tight bbox calculations on
+    # some backends; using `bbox_inches=None` and `pad_inches=0` produces a
+    # full-figure image with minimal margins.
+    fig.savefig(out_png, dpi=dpi, bbox_inches=None, pad_inches=0)
+    # Release the figure; generate_pages.py renders many maps in one process.
+    plt.close(fig)
+    print(f"Saved static map to {out_png}")
+
 
 def generate_interactive_map(merged_gdf, value_col, out_html, fill_color=DEFAULT_INTERACTIVE_COLORMAP, missing_color=DEFAULT_MISSING_COLOR):
     if folium is None:
         print("Folium not installed; cannot create interactive map. Install folium and try again.")
         return
-    geojson = merged_gdf.to_json()
+    # Hand folium a GeoJSON-like dict directly (no to_json()/json.loads round
+    # trip); only the join key is needed as a feature property.
+    geo = merged_gdf[['iso_a3', 'geometry']]
+    if geo.crs is not None and not geo.crs.equals('EPSG:4326'):
+        geo = geo.to_crs('EPSG:4326')
     m = folium.Map(location=[10, 0], zoom_start=2, tiles='CartoDB positron')
     folium.Choropleth(
-        geo_data=geojson,
+        geo_data=geo.__geo_interface__,
         name='choropleth',
         data=merged_gdf,
         columns=['iso_a3', value_col],
@@ -260,29 +320,55 @@ def generate_interactive_map(merged_gdf, value_col, out_html, fill_color=DEFAULT
 
 
 
-def main():
-    p = argparse.ArgumentParser(description='Generate world choropleth from CSV')
-    p.add_argument('csv', help='Path to CSV file (country-level)')
-    p.add_argument('--country-col', help='Country column name in CSV')
-    p.add_argument('--iso-col', help='ISO (alpha-3 or alpha-2) column name in CSV (preferred)')
-    p.add_argument('--value-col', help='Numeric value column to plot')
-    # Output prefix defaults to outputs/<input_filename_without_ext>
-    p.add_argument('--output-prefix', help='Output path prefix (no extension)')
-    p.add_argument('--interactive', action='store_true', help='Also generate interactive HTML map using folium')
-    p.add_argument('--colormap', help=f"Matplotlib colormap for static plot (default: {DEFAULT_COLORMAP})")
-    p.add_argument('--title', help=f"Title template for static plot; use '{{value_col}}' to insert column name (default: '{DEFAULT_TITLE_TEMPLATE}')")
-    args = p.parse_args()
+def choose_iso_column(gdf):
+    candidates = [c for c in gdf.columns if c.lower() in (
+        'iso_a3', 'iso3', 'iso', 'adm0_a3')]
+    if not candidates:
+        candidates = [c for c in gdf.columns if c.upper() in ('ISO_A3', 'ADM0_A3', 'ISO3')]
+    if not candidates:
+        return None
+    def score_col(col):
+        # one regex pass; placeholders like '-99' or '0' can't match
+        vals = gdf[col].dropna().astype(str).str.strip()
+        return int(vals.str.fullmatch(r'[A-Za-z]{3}').sum())
+    scored = [(score_col(c), c) for c in candidates]
+    scored.sort(reverse=True)
+    best_score, best_col = scored[0]
+    if best_score == 0:
+        return None
+    return best_col
 
-    # Set output prefix to outputs/<input_filename_without_ext> if not provided
-    if args.output_prefix:
-        output_prefix = args.output_prefix
-    else:
-        input_basename = os.path.basename(args.csv)
-        input_name, _ = os.path.splitext(input_basename)
-        output_prefix = os.path.join('outputs', input_name)
-    os.makedirs(os.path.dirname(output_prefix), exist_ok=True)
 
-    df = load_and_prepare(args.csv, args.country_col, args.value_col, args.iso_col)
+def _normalize_world_iso(codes):
+    s = codes.astype(str).str.strip()
+    return s.str.upper().where(codes.notna() & ~s.isin(['', '-99', '0']))
+
+
+def _world_cache_path(simplify):
+    if not NE_CACHE:
+        return None
+    if not simplify:
+        return NE_CACHE
+    root, ext = os.path.splitext(NE_CACHE)
+    return f"{root}_s{simplify:g}{ext}"
+
+
+def load_world(simplify=DEFAULT_SIMPLIFY_TOLERANCE):
+    """Load the Natural Earth countries with a normalized `iso_a3` column.
+
+    Geometries are simplified with tolerance `simplify` (0/None to keep full
+    detail). The prepared dataset is cached next to `NE_CACHE`, one file per
+    tolerance, after the first load.
+
+    The result can be passed to `build_map(world=...)` so that several maps
+    share a single load.
+    """
+    cache_path = _world_cache_path(simplify)
+    if cache_path and os.path.exists(cache_path):
+        try:
+            return gpd.read_feather(cache_path)
+        except Exception as e:
+            print(f"Warning: ignoring unreadable Natural Earth cache {cache_path}: {e}")
 
     try:
         world = gpd.read_file(gpd.datasets.get_path('naturalearth_lowres'))
@@ -294,26 +380,6 @@ def main():
             print("If you're offline or behind a firewall, download the Natural Earth countries shapefile and pass its path.")
             sys.exit(1)
 
-    def choose_iso_column(gdf):
-        candidates = [c for c in gdf.columns if c.lower() in (
-            'iso_a3', 'iso3', 'iso', 'adm0_a3')]
-        if not candidates:
-            candidates = [c for c in gdf.columns if c.upper() in ('ISO_A3', 'ADM0_A3', 'ISO3')]
-        if not candidates:
-            return None
-        def score_col(col):
-            vals = gdf[col].dropna().astype(str).str.strip()
-            good = vals[vals.str.len() == 3]
-            good = good[good.str.isalpha()]
-            good = good[~good.isin(['-99', '0'])]
-            return len(good)
-        scored = [(score_col(c), c) for c in candidates]
-        scored.sort(reverse=True)
-        best_score, best_col = scored[0]
-        if best_score == 0:
-            return None
-        return best_col
-
     chosen = choose_iso_column(world)
     if chosen is None:
         print("Error: couldn't find an ISO3-like column in the Natural Earth dataset. Columns:", list(world.columns))
@@ -321,25 +387,51 @@ def main():
     if chosen != 'iso_a3':
         world = world.rename(columns={chosen: 'iso_a3'})
 
-    def _normalize_world_iso(code):
+    world['iso_a3'] = _normalize_world_iso(world['iso_a3'])
+    if simplify:
+        world['geometry'] = world.geometry.simplify(simplify, preserve_topology=True)
+
+    if cache_path:
+        tmp_path = None
         try:
-            if code is None:
-                return None
-            s = str(code).strip()
-            if not s or s in ('-99', '0'):
-                return None
-            if len(s) == 3:
-                return s.upper()
-            return s.upper()
-        except Exception:
-            return None
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # Write to a temp file and rename it into place so concurrent
+            # processes never read a partially written cache.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix='.tmp')
+            os.close(fd)
+            world.to_feather(tmp_path)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"Warning: couldn't write Natural Earth cache {cache_path}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return world
+
+
+def build_map(csv_path, value_col=None, out_prefix=None, iso_col=None, country_col=None,
+              colormap=None, title=None, interactive=False, world=None,
+              simplify=DEFAULT_SIMPLIFY_TOLERANCE):
+    """Render the static (and optionally interactive) map for one CSV.
+
+    `world` is the GeoDataFrame returned by `load_world()`; it is loaded on
+    demand (with `simplify` as tolerance) when not given.
+    """
+    # Set output prefix to outputs/<input_filename_without_ext> if not provided
+    if not out_prefix:
+        input_basename = os.path.basename(csv_path)
+        input_name, _ = os.path.splitext(input_basename)
+        out_prefix = os.path.join('outputs', input_name)
+    os.makedirs(os.path.dirname(out_prefix), exist_ok=True)
+
+    df = load_and_prepare(csv_path, country_col, value_col, iso_col)
 
-    world['iso_a3'] = world['iso_a3'].map(_normalize_world_iso)
+    if world is None:
+        world = load_world(simplify)
 
     merged = world.merge(df, how='left', left_on='iso_a3', right_on='iso_a3')
 
     try:
-        valname = args.value_col if args.value_col else auto_detect_columns(df)[1]
+        valname = value_col if value_col else auto_detect_columns(df)[1]
     except Exception:
         valname = None
     print(f"Input rows: {len(df)}; unique ISO codes in input: {df['iso_a3'].nunique()}")
@@ -353,15 +445,35 @@ def main():
     matched = merged[valname].notna().sum() if valname and valname in merged.columns else merged['iso_a3'].notna().sum()
     print(f"World rows: {len(world)}; matched rows after merge (non-null '{valname}'): {matched}")
 
-    out_png = output_prefix + '.png'
-    colormap = args.colormap or DEFAULT_COLORMAP
-    title_template = args.title or DEFAULT_TITLE_TEMPLATE
+    out_png = out_prefix + '.png'
+    colormap = colormap or DEFAULT_COLORMAP
+    title_template = title or DEFAULT_TITLE_TEMPLATE
     generate_static_map(merged, valname, out_png, colormap=colormap, title_template=title_template)
 
-    if args.interactive:
-        out_html = output_prefix + '.html'
+    if interactive:
+        out_html = out_prefix + '.html'
         generate_interactive_map(merged, valname, out_html, fill_color=colormap)
 
 
+def main():
+    p = argparse.ArgumentParser(description='Generate world choropleth from CSV')
+    p.add_argument('csv', help='Path to CSV file (country-level)')
+    p.add_argument('--country-col', help='Country column name in CSV')
+    p.add_argument('--iso-col', help='ISO (alpha-3 or alpha-2) column name in CSV (preferred)')
+    p.add_argument('--value-col', help='Numeric value column to plot')
+    # Output prefix defaults to outputs/<input_filename_without_ext>
+    p.add_argument('--output-prefix', help='Output path prefix (no extension)')
+    p.add_argument('--interactive', action='store_true', help='Also generate interactive HTML map using folium')
+    p.add_argument('--colormap', help=f"Matplotlib colormap for static plot (default: {DEFAULT_COLORMAP})")
+    p.add_argument('--title', help=f"Title template for static plot; use '{{value_col}}' to insert column name (default: '{DEFAULT_TITLE_TEMPLATE}')")
+    p.add_argument('--simplify', type=float, default=DEFAULT_SIMPLIFY_TOLERANCE, metavar='TOLERANCE',
+                   help=f"Simplify country outlines with this tolerance in degrees; 0 keeps full detail (default: {DEFAULT_SIMPLIFY_TOLERANCE})")
+    args = p.parse_args()
+
+    build_map(args.csv, value_col=args.value_col, out_prefix=args.output_prefix,
+              iso_col=args.iso_col, country_col=args.country_col, colormap=args.colormap,
+              title=args.title, interactive=args.interactive, simplify=args.simplify)
+
+
 if __name__ == '__main__':
     main()
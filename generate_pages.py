@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 """Generate interactive HTML pages from `interactive.json`.
 
-This script reads `interactive.json`, invokes `generate_choropleth.py` for
-each map entry with `--interactive`, and writes the HTML pages into `pages/`.
+This script reads `interactive.json`, renders each map entry with
+`generate_choropleth.build_map(..., interactive=True)`, and writes the HTML
+pages into `pages/`. The Natural Earth dataset is loaded once and shared by
+all maps; pass `--isolated` to run `generate_choropleth.py` in a separate
+process per map instead. Maps are rendered in parallel worker processes
+(one per CPU by default, see `--jobs`).
 
 Usage:
   python3 generate_pages.py --config interactive.json
+  python3 generate_pages.py --config interactive.json --isolated
+  python3 generate_pages.py --config interactive.json --jobs 1
 
 Requirements: `generate_choropleth.py` in the same folder, and optional
 `folium` for interactive maps.
@@ -15,12 +21,16 @@ import json
 import os
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
 ROOT = os.path.dirname(os.path.abspath(__file__))
 
+# World GeoDataFrame handed to each worker process by `_init_worker`.
+_WORLD = None
 
-def run_map(map_cfg, inputs_dir, pages_dir):
+
+def run_map(map_cfg, inputs_dir, pages_dir, world=None, isolated=False):
     map_id = map_cfg.get('id') or os.path.splitext(map_cfg.get('csv', ''))[0]
     csv = map_cfg.get('csv')
     if not csv:
@@ -34,6 +44,26 @@ def run_map(map_cfg, inputs_dir, pages_dir):
     os.makedirs(pages_dir, exist_ok=True)
     out_prefix = os.path.join(pages_dir, map_id)
 
+    if isolated:
+        return run_map_subprocess(map_id, map_cfg, csv_path, out_prefix)
+
+    from generate_choropleth import build_map
+
+    colormap = str(map_cfg['colormap']) if map_cfg.get('colormap') else None
+    title = str(map_cfg['title']) if map_cfg.get('title') else None
+    print('Building:', csv_path, '->', out_prefix)
+    try:
+        build_map(csv_path, value_col=map_cfg.get('value_col'), out_prefix=out_prefix,
+                  iso_col=map_cfg.get('iso_col'), colormap=colormap, title=title,
+                  interactive=True, world=world)
+        return True
+    except (Exception, SystemExit) as e:
+        # build_map exits on unusable input; keep going with the other maps
+        print('Error generating map', map_id, e)
+        return False
+
+
+def run_map_subprocess(map_id, map_cfg, csv_path, out_prefix):
     cmd = [sys.executable, os.path.join(ROOT, 'generate_choropleth.py'), csv_path]
     # value column (required)
     value_col = map_cfg.get('value_col')
@@ -61,11 +91,25 @@ def run_map(map_cfg, inputs_dir, pages_dir):
         return False
 
 
+def _init_worker(world):
+    global _WORLD
+    _WORLD = world
+
+
+def _generate(map_cfg, inputs_dir, pages_dir, isolated):
+    print('\n=== Generating', map_cfg.get('id') or map_cfg.get('csv'), '===')
+    return run_map(map_cfg, inputs_dir, pages_dir, world=_WORLD, isolated=isolated)
+
+
 def main():
     p = argparse.ArgumentParser(description='Generate interactive pages from interactive.json')
     p.add_argument('--config', default=os.path.join(ROOT, 'interactive.json'), help='Path to interactive.json')
     p.add_argument('--inputs', default=os.path.join(ROOT, 'inputs'), help='Inputs directory')
     p.add_argument('--pages', default=os.path.join(ROOT, 'pages'), help='Output pages directory')
+    p.add_argument('--isolated', action='store_true',
+                   help='Run generate_choropleth.py in a separate process for each map')
+    p.add_argument('--jobs', type=int,
+                   help='Number of maps rendered in parallel (default: number of CPUs)')
     args = p.parse_args()
 
     if not os.path.exists(args.config):
@@ -80,12 +124,29 @@ def main():
         print('No maps defined in config (maps array is empty).')
         sys.exit(0)
 
+    world = None
+    if not args.isolated:
+        from generate_choropleth import load_world
+        world = load_world()
+
     total = len(maps)
     ok = 0
-    for m in maps:
-        print('\n=== Generating', m.get('id') or m.get('csv'), '===')
-        if run_map(m, args.inputs, args.pages):
-            ok += 1
+    jobs = args.jobs or min(total, os.cpu_count() or 1)
+    if jobs <= 1:
+        _init_worker(world)
+        for m in maps:
+            if _generate(m, args.inputs, args.pages, args.isolated):
+                ok += 1
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(world,)) as ex:
+            futures = {ex.submit(_generate, m, args.inputs, args.pages, args.isolated): m for m in maps}
+            for fut in as_completed(futures):
+                try:
+                    if fut.result():
+                        ok += 1
+                except Exception as e:
+                    m = futures[fut]
+                    print('Error generating map', m.get('id') or m.get('csv'), e)
 
     print(f'\nFinished: generated {ok}/{total} interactive pages in {args.pages}')
 